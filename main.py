@@ -1,15 +1,32 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
-import ast
+import hmac
+import time
+from contextlib import contextmanager
+from functools import wraps
+from collections import namedtuple
+from datetime import datetime
 from src.performance_optimizer import optimizer
+from src.channels import parse_channels
 
 from dotenv import load_dotenv
-load_dotenv()
 
 # --- Auth setup ---
-KPKUSERNAME = os.getenv("KPKUSERNAME")
-KPKPASSWORD = os.getenv("KPKPASSWORD")
+Credentials = namedtuple("Credentials", ["username", "password"])
+
+# Resolved once per process instead of re-reading .env on every rerun
+@st.cache_resource(show_spinner=False)
+def get_creds():
+    load_dotenv()
+    return Credentials(os.getenv("KPKUSERNAME"), os.getenv("KPKPASSWORD"))
+
+def credential_matches(given, expected):
+    # Constant-time comparison; an unset credential never matches
+    return expected is not None and hmac.compare_digest(given.encode(), expected.encode())
 
 st.set_page_config(page_title="kpk Hypernative Monitors", layout="wide", page_icon="🚀")
 
@@ -23,7 +40,8 @@ if not st.session_state.authenticated:
         submitted = st.form_submit_button("Login")
 
         if submitted:
-            if input_username == KPKUSERNAME and input_password == KPKPASSWORD:
+            creds = get_creds()
+            if credential_matches(input_username, creds.username) & credential_matches(input_password, creds.password):
                 st.session_state.authenticated = True
                 st.success("Login successful. Loading app...")
                 st.rerun()
@@ -34,18 +52,87 @@ if not st.session_state.authenticated:
 st.title("📡 Hypernative Monitors Dashboard")
 
 # --- Utility functions ---
-@st.cache_data(ttl=300, show_spinner=False)  # 5 minute cache - disabled spinner to avoid duplicate loading messages
+DISPLAY_STR_COLS = ["fullMonitorName", "monitorType", "monitor", "monitorLink", "monitorDescription",
+                    "suitBlockchain", "suitProtocol", "suitLabel", "suitAddress", "Client", "fullSuiteName"]
+
+# Wall time of the last run of each step, in ms, shown in the Debug Info sidebar
+@contextmanager
+def record_timing(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        st.session_state.setdefault("timings", {})[name] = (time.perf_counter() - start) * 1000
+
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with record_timing(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def cache_memory_stats():
+    # Bytes held per cached function, across st.cache_data and st.cache_resource.
+    # Sizes every cached object (the whole load_data frame included), so only run it on request.
+    # The stats providers are Streamlit internals, imported here so a moved module only hides this table.
+    try:
+        from streamlit.runtime.caching import get_data_cache_stats_provider, get_resource_cache_stats_provider
+    except ImportError:
+        return []
+    stats = get_data_cache_stats_provider().get_stats() + get_resource_cache_stats_provider().get_stats()
+    return sorted(((s.cache_name.rsplit(".", 1)[-1], s.byte_length) for s in stats), key=lambda s: -s[1])
+
+# Cached as a resource so reruns get the same frame back without hashing or copying it;
+# callers must treat it as read-only. 5 minute TTL, spinner disabled to avoid duplicate loading messages.
+# Timed outside the cache, so a hit shows up as a near-zero load_data time
+@timed("load_data")
+@st.cache_resource(ttl=300, show_spinner=False)
 def load_data(force_refresh=False):
     try:
         # Use limit for testing - set to 5 suits for quick testing
         test_limit = 5 if st.session_state.get('test_mode', False) else None
-        df = optimizer.get_hn_monitors_optimized(force_refresh=force_refresh, limit_suits=test_limit)
+        with record_timing("fetch"):
+            df = optimizer.get_hn_monitors_optimized(force_refresh=force_refresh, limit_suits=test_limit)
         
         # Validate that we got actual data
         if df is None or df.empty:
             st.warning("⚠️ No data returned from API. This might be a temporary issue.")
             return pd.DataFrame()
         
+        # Only the columns that are displayed or matched need empty-string NAs
+        for col in DISPLAY_STR_COLS:
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and "" not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories("")
+        df[DISPLAY_STR_COLS] = df[DISPLAY_STR_COLS].fillna("")
+        # Low-cardinality columns that are grouped and compared on every rerun
+        for col in ("Client", "fullSuiteName", "suitProtocol", "suitBlockchain", "monitorType"):
+            df[col] = df[col].astype("category")
+
+        # Parse channels once into Arrow list columns; lowercasing and joining run as Arrow kernels
+        with record_timing("parse_channels"):
+            # As object first: a categorical column can't map to (unhashable) lists
+            raw_channels = df["monitorAlertChannel"].astype(object)
+            channels = pa.array(raw_channels.map(parse_channels).tolist(), type=pa.list_(pa.string()))
+            channels_lower = pa.ListArray.from_arrays(channels.offsets, pc.utf8_lower(channels.flatten()))
+        df["monitorAlertChannel"] = pd.arrays.ArrowExtensionArray(channels)
+        df["_channels_lower"] = pd.arrays.ArrowExtensionArray(channels_lower)
+        # Newline-joined so a single substring search covers every channel of a row
+        df["_channels_joined"] = pc.binary_join(channels_lower, "\n").to_numpy(zero_copy_only=False)
+        desc = df["monitorDescription"]
+        df["monitorDescription_short"] = desc.where(desc.str.len() <= 250, desc.str.slice(0, 250) + "…")
+        # Client-independent part of each monitor's markdown line, built with vectorized string ops
+        link = df["monitorLink"].astype(str)
+        df["_link_md"] = ("[↗️](" + link + ")").where(link != "", "")
+        df["_monitor_md"] = (
+            "**" + df["monitor"].astype(str) + "** | *"
+            + df["monitorType"].astype(str) + "* | "
+            + df["fullMonitorName"].astype(str) + " " + df["_link_md"]
+        )
+
+        # Stamp the load so derived helpers can be cached per dataset
+        df.attrs["loaded_at"] = datetime.now().isoformat()
         return df
         
     except Exception as e:
@@ -56,46 +143,114 @@ def load_data(force_refresh=False):
         st.error(f"Debug info: {traceback.format_exc()}")
         return pd.DataFrame()
 
-def parse_channels(raw):
-    if isinstance(raw, list):
-        return raw
-    if isinstance(raw, str):
-        try:
-            # Try to parse as a literal list
-            parsed = ast.literal_eval(raw)
-            if isinstance(parsed, list):
-                return parsed
-        except Exception:
-            pass
-        # Fallback: treat as comma-separated string
-        return [s.strip() for s in raw.split(",") if s.strip()]
-    return []
-
-
-def is_assigned_to_client(row, client_name):
-    channels = parse_channels(row.get("monitorAlertChannel", []))
-    client_lower = client_name.lower().strip()
-    return any(client_lower in str(c).lower() for c in channels)
-
-def show_monitor(row, channels, client_name):
-    monitor_name = row.get("fullMonitorName", "Unnamed Monitor")
-    monitor_type = row.get("monitorType", "Unknown Type")
-    monitor = row.get("monitor", "Unknown Monitor")
-    monitor_link = row.get("monitorLink", "")
-    monitor_desc = row.get("monitorDescription", "")
-    monitor_desc = (monitor_desc[:250] + "…") if len(monitor_desc) > 250 else monitor_desc
-
-    is_assigned = any(client_name.lower().strip() in c.lower() for c in channels)
-    status_icon = "✅" if is_assigned else "❔"
-    link = f"[↗️]({monitor_link})" if monitor_link else ""
-    relevant_channels = [c for c in channels if client_name.lower().strip() in c.lower()]
-
-    st.markdown(
-        f"- {status_icon} **{monitor}** | *{monitor_type}* | {monitor_name} {link}  \n"
+def monitor_markdown(monitor_md, monitor_desc, channels, channels_lower, client_lower):
+    relevant_channels = [c for c, c_lower in zip(channels, channels_lower) if client_lower in c_lower]
+    status_icon = "✅" if relevant_channels else "❔"
+
+    return (
+        f"- {status_icon} {monitor_md}  \n"
         f"&nbsp;&nbsp;&nbsp;&nbsp;📝 {monitor_desc}  \n"
         f"&nbsp;&nbsp;&nbsp;&nbsp;🔔 Channels: `{', '.join(relevant_channels) or '—'}`"
     )
 
+@st.cache_data(show_spinner=False, max_entries=1)
+def client_assignment_matrix(_df, loaded_at):
+    """Boolean rows x clients frame: does any of the row's channels mention the client"""
+    # Many monitors share a channel, so test each distinct channel string once and broadcast back to rows
+    codes, channels = pd.factorize(_df["_channels_joined"])
+    channels = pa.array(channels, type=pa.string())
+    matrix = {}
+    for client in client_names(_df, loaded_at):
+        hits = pc.match_substring(channels, client.lower().strip()).to_numpy(zero_copy_only=False)
+        matrix[client] = hits[codes]
+    return pd.DataFrame(matrix, index=_df.index)
+
+# Row-index lookups are shared read-only like the frame itself, so cache_resource hands them out
+# by reference instead of unpickling a copy per rerun; max_entries=1 drops indexes of older loads.
+# cache_data stays for the small per-client summaries, which expire with load_data's ttl.
+@st.cache_resource(show_spinner=False, max_entries=1)
+def client_assigned_rows(_df, loaded_at):
+    """Inverted index: client -> positions of the rows whose channels mention it"""
+    matrix = client_assignment_matrix(_df, loaded_at)
+    return {client: np.flatnonzero(matrix[client].to_numpy()) for client in matrix.columns}
+
+def assigned_to_client(df, client_name):
+    mask = np.zeros(len(df), dtype=bool)
+    mask[client_assigned_rows(df, df.attrs.get("loaded_at"))[client_name]] = True
+    return mask
+
+@st.cache_data(show_spinner=False, ttl=300)
+def suite_assigned_counts(_df, loaded_at, client_name):
+    # Assigned monitors per suite for the given client; only the client's matching rows are visited
+    rows = client_assigned_rows(_df, loaded_at)[client_name]
+    return _df["fullSuiteName"].iloc[rows].value_counts(sort=False).to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def client_names(_df, loaded_at):
+    return sorted(c for c in client_row_indices(_df, loaded_at) if isinstance(c, str) and c.strip())
+
+SUITE_META_COLUMNS = ["suitBlockchain", "suitProtocol", "suitLabel", "suitAddress"]
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def suite_metadata(_df, loaded_at):
+    # Suite name -> its shared suit* fields, taken from the suite's first row
+    suite_meta = _df.drop_duplicates("fullSuiteName").set_index("fullSuiteName")[SUITE_META_COLUMNS]
+    return suite_meta.to_dict("index")
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def category_codes(_df, loaded_at, column):
+    # Category value -> integer code, for short stable widget keys
+    return {value: code for code, value in enumerate(_df[column].cat.categories)}
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def client_row_indices(_df, loaded_at):
+    # Client -> row positions, replacing a full-column comparison per rerun.
+    # One stable sort of the factorized codes, then each client is a contiguous run of it.
+    codes, uniques = pd.factorize(_df["Client"])
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {client: order[bounds[i]:bounds[i + 1]] for i, client in enumerate(uniques)}
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def suite_row_indices(_df, loaded_at):
+    # Suite name -> row positions, so suites are sliced only when rendered
+    return _df.groupby("fullSuiteName", sort=False, observed=True).indices
+
+@st.cache_data(show_spinner=False, ttl=300)
+def client_suite_names(_df, loaded_at, client_name):
+    # Suites the client owns, in first-seen order; reads only the client's rows of the suite column
+    rows = client_row_indices(_df, loaded_at)[client_name]
+    suites = _df["fullSuiteName"]
+    codes = pd.unique(suites.cat.codes.to_numpy()[rows])
+    return list(suites.cat.categories[codes])
+
+# Monitors shown per page in a suite section; markdown is not virtualized
+MONITORS_PER_PAGE = 50
+
+# Columns read per monitor when rendering a suite
+MONITOR_COLUMNS = ("_monitor_md", "monitorDescription_short", "monitorAlertChannel", "_channels_lower")
+
+@st.cache_data(show_spinner=False, ttl=300)
+def render_suite_markdown(_df_suite, _assigned, loaded_at, client_name, suite_name):
+    """Build the (assigned, unassigned) markdown entries for one suite, cached per load, client and suite"""
+    arr = {c: _df_suite[c].to_numpy() for c in MONITOR_COLUMNS}
+    client_lower = client_name.lower().strip()
+
+    # The assignment mask already says no channel of an unassigned monitor matches, so skip their scan
+    return tuple(
+        tuple(
+            monitor_markdown(
+                arr["_monitor_md"][i],
+                arr["monitorDescription_short"][i],
+                arr["monitorAlertChannel"][i] if scan else (),
+                arr["_channels_lower"][i] if scan else (),
+                client_lower,
+            )
+            for i in idx
+        )
+        for idx, scan in ((np.where(_assigned)[0], True), (np.where(~_assigned)[0], False))
+    )
+
 # --- Data load ---
 # Check if we should force refresh
 force_refresh = st.session_state.get('force_refresh', False)
@@ -106,19 +261,21 @@ if force_refresh:
 first_load = st.session_state.get('first_load', True)
 if first_load:
     st.session_state.first_load = False
-    force_refresh = True  # Force fresh data on first load
+    # Force fresh data on first load only when nothing is cached yet
+    if optimizer.cache_age() is None:
+        force_refresh = True
+
+# A fresh cache, or one expired for less than another cache_duration, is served right away;
+# the optimizer refreshes the latter in the background. Anything older is fetched synchronously.
+cache_age = optimizer.cache_age()
+cache_servable = cache_age is not None and cache_age < 2 * optimizer.cache_duration
 
 # Load data with minimal loading indicators
-if force_refresh:
+if force_refresh or not cache_servable:
     with st.spinner("Loading data..."):
         df = load_data(force_refresh=force_refresh)
 else:
-    # Check if we have cached data
-    if optimizer.is_cache_valid():
-        df = load_data(force_refresh=force_refresh)
-    else:
-        with st.spinner("Loading data..."):
-            df = load_data(force_refresh=True)
+    df = load_data(force_refresh=False)
 
 if df.empty:
     st.error("No data available. Please check your connection and try refreshing.")
@@ -154,15 +311,12 @@ if df.empty:
             st.write(f"**Cache Error:** {e}")
     
     st.stop()  # Stop the app if no data is available
-else:
-    df.fillna("", inplace=True)
-    
-    # Data loaded successfully - no status messages needed
+
+# Data loaded successfully - no status messages needed
 
 # --- Sidebar and client selection ---
 st.sidebar.title("👤 Select Client")
-clients = sorted(df["Client"].dropna().unique())
-clients = [c for c in clients if str(c).strip() != ""]
+clients = client_names(df, df.attrs.get("loaded_at"))
 
 if not clients:
     st.warning("No clients available. Please refresh the data.")
@@ -173,6 +327,8 @@ else:
 if st.sidebar.button("🔄 Refresh Data"):
     # Set flag to force refresh and clear cache
     st.session_state.force_refresh = True
+    optimizer.clear_cache()
+    st.cache_resource.clear()
     st.cache_data.clear()
     st.success("Cache cleared. Refreshing data...")
     st.rerun()
@@ -197,6 +353,20 @@ with st.sidebar.expander("🔧 Debug Info", expanded=False):
         st.write(f"**Clients Found:** {len(clients)}")
         st.write(f"**Sample Client:** {clients[0] if clients else 'None'}")
     
+    timings = st.session_state.get("timings", {})
+    if timings:
+        st.write("**Last Timings (ms):**")
+        for name, ms in timings.items():
+            st.write(f"- {name}: {ms:.1f}")
+    
+    # Expander bodies run on every rerun even when collapsed, so the sizing waits for this checkbox
+    if st.checkbox("Show cache memory", key="show_cache_memory"):
+        cache_stats = cache_memory_stats()
+        if cache_stats:
+            st.write("**Cache Memory:**")
+            for name, byte_length in cache_stats:
+                st.write(f"- {name}: {byte_length / 1024:.0f} KB")
+    
     # Test mode toggle
     test_mode = st.checkbox("Test Mode (5 suits only)", value=st.session_state.get('test_mode', False))
     if test_mode != st.session_state.get('test_mode', False):
@@ -204,6 +374,7 @@ with st.sidebar.expander("🔧 Debug Info", expanded=False):
         st.rerun()
     
     if st.button("🗑️ Clear Cache"):
+        st.cache_resource.clear()
         st.cache_data.clear()
         st.success("Cache cleared!")
         st.rerun()
@@ -213,66 +384,90 @@ if selected_client is None:
     st.info("Please select a client from the sidebar to view their monitors.")
     st.stop()
 
-df_client = df[df["Client"] == selected_client]
-suite_monitors = dict(tuple(df.groupby("fullSuiteName", sort=False)))
-client_suites = df_client["fullSuiteName"].unique()
+suite_indices = suite_row_indices(df, df.attrs.get("loaded_at"))
+client_suites = client_suite_names(df, df.attrs.get("loaded_at"), selected_client)
 
-total_suits = df_client["fullSuiteName"].nunique()
+total_suits = len(client_suites)
 
 # --- Count assigned monitors before rendering summary ---
-total_assigned_monitors = 0
-total_unassigned_monitors = 0
-
-for suite in client_suites:
-    df_suite_all = suite_monitors.get(suite)
-    if df_suite_all is None:
-        continue
-
-    for _, row in df_suite_all.iterrows():
-        channels = parse_channels(row.get("monitorAlertChannel", []))
-        #assigned = any(selected_client.lower() in c.lower() for c in channels)
-        assigned = any(selected_client.lower().strip() in str(c).lower() for c in channels)
-        if assigned:
-            total_assigned_monitors += 1
-        else:
-            total_unassigned_monitors += 1
+with record_timing("summary"):
+    # Suite totals come from the suite row index the render loop slices with, so rows aren't walked again
+    assigned_counts = suite_assigned_counts(df, df.attrs.get("loaded_at"), selected_client)
+    counts_by_suite = {suite: (assigned_counts.get(suite, 0), len(suite_indices[suite])) for suite in client_suites}
+    total_assigned_monitors = sum(assigned for assigned, _ in counts_by_suite.values())
+    total_unassigned_monitors = sum(total - assigned for assigned, total in counts_by_suite.values())
 
 st.markdown(f"## 🔎 Overview for `{selected_client}`")
 st.info(f"**Client Summary:** 🛡️ {total_suits} Suits | ✅ {total_assigned_monitors} Assigned Monitors | ❔ {total_unassigned_monitors} Unassigned Monitors")
 
 
 # --- Display data by suite ---
-for suite in client_suites:
-    df_suite_all = suite_monitors.get(suite)
-    if df_suite_all is None:
-        continue
-
-    suite_title = df_suite_all["fullSuiteName"].iloc[0] or "Unnamed Suite"
-
-    with st.expander(f"🧱 {suite_title}", expanded=False):
+# Suites whose monitor lists are shown, as (client, suite) pairs. Kept outside widget state so
+# it survives switching clients, which drops the checkboxes of the previous client.
+if "open_suites" not in st.session_state:
+    st.session_state.open_suites = set()
+
+def toggle_suite(client_name, suite):
+    st.session_state.open_suites ^= {(client_name, suite)}
+
+# One fragment per suite, so toggling or paging a suite reruns only that suite
+@st.fragment
+def render_suite(client_name, df, suite, suite_idx, open_key, suite_counts):
+    loaded_at = df.attrs.get("loaded_at")
+    meta = suite_metadata(df, loaded_at)[suite]
+    suite_title = suite or "Unnamed Suite"
+
+    # Streamlit runs expander bodies even when collapsed, so only open suites build their monitor list
+    is_open = (client_name, suite) in st.session_state.open_suites
+
+    suite_assigned, suite_total = suite_counts
+    with st.expander(f"🧱 {suite_title} · ✅ {suite_assigned}/{suite_total}", expanded=is_open):
         col1, col2 = st.columns([1, 5])
         with col1:
-            st.write("**Blockchain:**", df_suite_all["suitBlockchain"].iloc[0])
-            st.write("**Protocol:**", df_suite_all["suitProtocol"].iloc[0])
+            st.write("**Blockchain:**", meta["suitBlockchain"])
+            st.write("**Protocol:**", meta["suitProtocol"])
         with col2:
-            st.write("**Label:**", df_suite_all["suitLabel"].iloc[0])
-            st.write("**Address:**", df_suite_all["suitAddress"].iloc[0])
-
-        assigned_rows = []
-        unassigned_rows = []
-
-        for _, row in df_suite_all.iterrows():
-            channels = parse_channels(row.get("monitorAlertChannel", []))
-                
-            assigned = any(selected_client.lower().strip() in c.lower() for c in channels)
-            (assigned_rows if assigned else unassigned_rows).append((row, channels))
-
-        if assigned_rows:
-            st.markdown("#### ✅ Assigned Monitors")
-            for row, channels in assigned_rows:
-                show_monitor(row, channels, selected_client)
-
-        if unassigned_rows:
-            st.markdown("#### ❔ Unassigned Monitors")
-            for row, channels in unassigned_rows:
-                show_monitor(row, channels, selected_client)
+            st.write("**Label:**", meta["suitLabel"])
+            st.write("**Address:**", meta["suitAddress"])
+
+        st.checkbox(
+            "Show monitors", value=is_open, key=open_key, on_change=toggle_suite, args=(client_name, suite)
+        )
+        if not is_open:
+            return
+
+        assigned = assigned_to_client(df, client_name)
+        assigned_lines, unassigned_lines = render_suite_markdown(
+            df.iloc[suite_idx], assigned[suite_idx], loaded_at, client_name, suite
+        )
+        for section, title, lines in (
+            ("assigned", "#### ✅ Assigned Monitors", assigned_lines),
+            ("unassigned", "#### ❔ Unassigned Monitors", unassigned_lines),
+        ):
+            if not lines:
+                continue
+            st.markdown(title)
+            start = 0
+            if len(lines) > MONITORS_PER_PAGE:
+                pages = -(-len(lines) // MONITORS_PER_PAGE)
+                page = st.number_input(
+                    f"Page (1-{pages})", min_value=1, max_value=pages, key=f"{open_key}_{section}_page"
+                )
+                start = (page - 1) * MONITORS_PER_PAGE
+            # One markdown element per page instead of one per monitor
+            st.markdown("\n".join(lines[start:start + MONITORS_PER_PAGE]))
+
+def render_client(client_name, df, client_suites, suite_indices, counts_by_suite):
+    loaded_at = df.attrs.get("loaded_at")
+    client_code = category_codes(df, loaded_at, "Client")[client_name]
+    suite_codes = category_codes(df, loaded_at, "fullSuiteName")
+
+    for suite in client_suites:
+        suite_idx = suite_indices.get(suite)
+        if suite_idx is None:
+            continue
+        open_key = f"open_c{client_code}_s{suite_codes[suite]}"
+        render_suite(client_name, df, suite, suite_idx, open_key, counts_by_suite[suite])
+
+with record_timing("render"):
+    render_client(selected_client, df, client_suites, suite_indices, counts_by_suite)
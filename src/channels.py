@@ -1,3 +1,7 @@
+import ast
+import json
+from functools import lru_cache
+
 from src.login import header
 import requests
 # endpoint_notification = "https://api.hypernative.xyz/notification-channels"
@@ -54,4 +58,31 @@ channels = [
     {"name": "gearbox-monitoring", "dao": "Gearbox"},
     {"name": "morpho-action", "dao": "Morpho"},
     {"name": "morpho-monitoring", "dao": "Morpho"},
-]
\ No newline at end of file
+]
+
+
+def parse_channels(raw):
+    """Normalize a monitorAlertChannel value into a list of channel names"""
+    if isinstance(raw, list):
+        return raw
+    if isinstance(raw, str):
+        return list(_parse_channel_string(raw))
+    return []
+
+
+@lru_cache(maxsize=200_000)
+def _parse_channel_string(raw):
+    # Channel strings repeat across rows, so each distinct one is parsed once
+    if raw.lstrip().startswith("["):
+        # JSON lists are much cheaper to decode than a Python literal AST
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            try:
+                parsed = ast.literal_eval(raw)
+            except Exception:
+                parsed = None
+        if isinstance(parsed, list):
+            return tuple(str(c) for c in parsed)
+    # Fallback: treat as comma-separated string
+    return tuple(s.strip() for s in raw.split(",") if s.strip())
@@ -1,12 +1,17 @@
 import os
 import time
+import json
+import hashlib
 import logging
-import requests
+import threading
+from functools import lru_cache
 import pandas as pd
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import pyarrow as pa
+import pyarrow.compute as pc
+from concurrent.futures import ThreadPoolExecutor
 
-from src.login import header
+from src.login import session
+from src.ratelimit import TokenBucket
 from src.channels import channels
 
 # --- Logging setup ---
@@ -16,111 +21,176 @@ logging.basicConfig(
 )
 
 OUTPUT_DIR = "output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 CSV_FILENAME = "hn_monitors.csv"
 CSV_PATH = os.path.join(OUTPUT_DIR, CSV_FILENAME)
 
+# Disk cache of raw API responses, keyed by sha1(url); TTL in seconds, one week by default
+HTTP_CACHE_DIR = os.path.join("cache", "http")
+HTTP_CACHE_TTL = int(os.getenv("HN_HTTP_CACHE_TTL", 7 * 24 * 3600))
+
+# Output columns; add_monitor_rows takes the per-monitor values in this order
+COLUMN_NAMES = (
+    "fullSuiteName",
+    "suitContractType",
+    "suitBlockchain",
+    "suitProtocol",
+    "suitAddress",
+    "suitSymbol",
+    "suitLabel",
+    "fullMonitorName",
+    "monitorType",
+    "monitorRiskID",
+    "monitorContractType",
+    "monitorBlockchain",
+    "monitorProtocol",
+    "monitorAddress",
+    "monitorSymbol",
+    "monitorLabel",
+    "monitorAlertChannel",
+    "monitorDescription",
+    "monitorLink",
+    "monitor",
+    "Client",
+)
+SCHEMA = pa.schema([(name, pa.string()) for name in COLUMN_NAMES])
+# Low-cardinality columns, returned as pandas categoricals
+CATEGORY_COLUMNS = ("suitBlockchain", "suitContractType", "monitorContractType", "monitorType", "monitor", "Client")
+
 SUITS_ENDPOINT = "https://api.hypernative.xyz/security-suit/"
+WATCHLIST_ENDPOINT = "https://api.hypernative.xyz/watchlists/{id}/"
+CUSTOM_AGENT_ENDPOINT = "https://api.hypernative.xyz/custom-agents/{id}/"
+
+# Concurrent watchlist/custom-agent requests (the shared session pools up to 64 connections)
+MAX_WORKERS = 32
+
+# Requests per second sent to the API; a full round of workers may start at once.
+# 429/5xx replies are retried with backoff by the session (honouring Retry-After).
+MAX_REQUESTS_PER_SECOND = float(os.getenv("HN_MAX_RPS", 10))
+rate_limiter = TokenBucket(MAX_REQUESTS_PER_SECOND, MAX_WORKERS)
+
+# (connect, read) seconds: an unreachable host fails fast, a slow body still gets time
+REQUEST_TIMEOUT = (3, 10)
 
 
 # -----------------------
 # Parsing helpers
 # -----------------------
+def _second_token(name: str):
+    # Second space-separated token without splitting the rest of the name; None if there is none
+    first_space = name.find(" ")
+    if first_space < 0:
+        return None
+    second_space = name.find(" ", first_space + 1)
+    return name[first_space + 1:] if second_space < 0 else name[first_space + 1:second_space]
+
+
+def _split_fields(name: str, n: int):
+    # First n space-separated fields plus the unsplit rest (== " ".join(parts[n:])), padded with ""
+    parts = name.split(" ", n)
+    return parts + [""] * (n + 1 - len(parts))
+
+
+SUIT_CONTRACT_TYPES = frozenset({"[TOKEN]", "[POOL]", "[VAULT]", "[BRIDGE]"})
+
+
+@lru_cache(maxsize=4096)
 def parse_suit_name(name: str):
-    parts = name.split(" ")
-    contract_type = parts[0]
-    symbol = ""
-    if contract_type not in {"[TOKEN]", "[POOL]", "[VAULT]", "[BRIDGE]"}:
+    # Reject on the first token before splitting the whole name
+    first_space = name.find(" ")
+    if first_space < 0:
+        return None
+    contract_type = name[:first_space]
+    if contract_type not in SUIT_CONTRACT_TYPES or name.count(" ") < 3:
         return None
-    blockchain = parts[1]
+    _, blockchain, third, fourth, label = _split_fields(name, 4)
     if contract_type == "[TOKEN]":
-        address = parts[2]
-        symbol = parts[3]
-        label = " ".join(parts[4:])
-        protocol = ""
-    else:
-        protocol = parts[2]
-        address = parts[3]
-        label = " ".join(parts[4:])
-    return contract_type, blockchain, protocol, address, symbol, label
+        # [TOKEN] blockchain address symbol label
+        return contract_type, blockchain, "", third, fourth, label
+    # [TYPE] blockchain protocol address label
+    return contract_type, blockchain, third, fourth, "", label
+
+
+def _watchlist_protocol(name):
+    risk_id, contract_type, blockchain, protocol, _ = _split_fields(name, 4)
+    return risk_id, contract_type, blockchain, protocol, "", "", protocol
+
+
+def _watchlist_token(name):
+    risk_id, contract_type, blockchain, address, label = _split_fields(name, 4)
+    return risk_id, contract_type, blockchain, "", address, "", label
+
+
+def _watchlist_consensus_layer(name):
+    risk_id, contract_type, blockchain, label = _split_fields(name, 3)
+    return risk_id, contract_type, blockchain, "", "", "", label
+
+
+def _watchlist_protocol_address(name):
+    risk_id, contract_type, blockchain, protocol, address, label = _split_fields(name, 5)
+    return risk_id, contract_type, blockchain, protocol, address, "", label
+
+
+def _watchlist_l2(name):
+    risk_id, contract_type, label = _split_fields(name, 2)
+    return risk_id, contract_type, "", "", "", "", label
+
 
+# Contract type -> (fields the name must have, parser)
+WATCHLIST_PARSERS = {
+    "[PROTOCOL]": (4, _watchlist_protocol),
+    "[TOKEN]": (4, _watchlist_token),
+    "[CONSENSUSLAYER]": (3, _watchlist_consensus_layer),
+    "[MULTISIG]": (5, _watchlist_protocol_address),
+    "[POOL]": (5, _watchlist_protocol_address),
+    "[L2]": (2, _watchlist_l2),
+}
 
+
+@lru_cache(maxsize=4096)
 def parse_watchlist_name(name: str):
-    parts = name.split(" ")
-    risk_id = parts[0]
-    contract_type = parts[1]
-    if contract_type == "[PROTOCOL]":
-        blockchain = parts[2]
-        protocol = parts[3]
-        address = ""
-        label = protocol
-    elif contract_type == "[TOKEN]":
-        blockchain = parts[2]
-        address = parts[3]
-        label = " ".join(parts[4:])
-        protocol = ""
-    elif contract_type == "[CONSENSUSLAYER]":
-        blockchain = parts[2]
-        address = ""
-        protocol = ""
-        label = " ".join(parts[3:])
-    elif contract_type in {"[MULTISIG]", "[POOL]"}:
-        blockchain = parts[2]
-        protocol = parts[3]
-        address = parts[4]
-        label = " ".join(parts[5:])
-    elif contract_type == "[L2]":
-        address = ""
-        blockchain = ""
-        protocol = ""
-        label = " ".join(parts[2:])
-    else:
+    min_fields, parser = WATCHLIST_PARSERS.get(_second_token(name), (0, None))
+    if parser is None or name.count(" ") + 1 < min_fields:
         return None
-    return risk_id, contract_type, blockchain, protocol, address, "", label
+    return parser(name)
+
+
+def _agent_generic(name):
+    risk_id, contract_type, blockchain, protocol, address, symbol, label = _split_fields(name, 6)
+    return risk_id, contract_type, blockchain, protocol, address, symbol, label
+
 
+def _agent_token(name):
+    risk_id, contract_type, blockchain, address, symbol, label = _split_fields(name, 5)
+    return risk_id, contract_type, blockchain, "", address, symbol, label
 
+
+# Upper-cased contract type -> parser; the original casing is kept in the result
+CUSTOM_AGENT_PARSERS = {
+    **dict.fromkeys(
+        ("[VAULT]", "[EOA]", "[MULTISIG]", "[POOL]", "[OTHER]", "[ORACLE]", "[BRIDGE]", "[TIMELOCK]"),
+        _agent_generic,
+    ),
+    "[TOKEN]": _agent_token,
+}
+
+
+@lru_cache(maxsize=4096)
 def parse_custom_agent_name(name: str):
-    parts = name.split(" ")
-    
     # Handle edge cases with insufficient parts
-    if len(parts) < 2:
+    if " " not in name:
         # For very short names, return a basic structure
-        if len(parts) == 1:
-            return parts[0], "[OTHER]", "", "", "", "", ""
-        else:
-            return None
-    
-    risk_id = parts[0]
-    contract_type = parts[1]
-    
-    # Normalize contract type to uppercase for comparison
-    contract_type_upper = contract_type.upper()
-    
-    if contract_type_upper in {"[VAULT]", "[EOA]", "[MULTISIG]", "[POOL]", "[OTHER]", "[ORACLE]", "[BRIDGE]", "[TIMELOCK]"}:
-        blockchain = parts[2] if len(parts) > 2 else ""
-        protocol = parts[3] if len(parts) > 3 else ""
-        address = parts[4] if len(parts) > 4 else ""
-        symbol = parts[5] if len(parts) > 5 else ""
-        label = " ".join(parts[6:]) if len(parts) > 6 else ""
-    elif contract_type_upper == "[TOKEN]":
-        blockchain = parts[2] if len(parts) > 2 else ""
-        protocol = ""
-        address = parts[3] if len(parts) > 3 else ""
-        symbol = parts[4] if len(parts) > 4 else ""
-        label = " ".join(parts[5:]) if len(parts) > 5 else ""
-    else:
-        # Handle alternative format: [risk_id] blockchain protocol address symbol label
-        # This covers cases like "[29] Ethereum Gearbox 0x... rstETH 5%Volatility"
-        if len(parts) >= 4:
-            blockchain = parts[1] if len(parts) > 1 else ""
-            protocol = parts[2] if len(parts) > 2 else ""
-            address = parts[3] if len(parts) > 3 else ""
-            symbol = parts[4] if len(parts) > 4 else ""
-            label = " ".join(parts[5:]) if len(parts) > 5 else ""
-            contract_type = "[OTHER]"  # Default contract type for this format
-        else:
-            return None
-    return risk_id, contract_type, blockchain, protocol, address, symbol, label
+        return name, "[OTHER]", "", "", "", "", ""
+
+    parser = CUSTOM_AGENT_PARSERS.get(_second_token(name).upper())
+    if parser is not None:
+        return parser(name)
+
+    # Handle alternative format: [risk_id] blockchain protocol address symbol label
+    # This covers cases like "[29] Ethereum Gearbox 0x... rstETH 5%Volatility"
+    if name.count(" ") >= 3:
+        risk_id, blockchain, protocol, address, symbol, label = _split_fields(name, 5)
+        return risk_id, "[OTHER]", blockchain, protocol, address, symbol, label
+    return None
 
 
 def extract_channels(alert_policies):
@@ -137,71 +207,156 @@ def extract_channels(alert_policies):
         ...
       ]
     """
+    # dedupe preserving order, in the same pass
+    seen = set()
     out = []
-    for p in (alert_policies or []):
-        for cc in p.get("channelsConfigurations", []):
+    for p in (alert_policies or ()):
+        for cc in p.get("channelsConfigurations", ()):
             name = cc.get("name")
-            if name:
+            if name and name not in seen:
+                seen.add(name)
                 out.append(name)
-    # dedupe preserving order
-    return list(dict.fromkeys(out))
+    return out
+
+
+def cached_get(url, force_refresh=False):
+    """Return the JSON body for url, from disk when a copy younger than HTTP_CACHE_TTL exists"""
+    path = os.path.join(HTTP_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".json")
+    if not force_refresh:
+        try:
+            if time.time() - os.path.getmtime(path) < HTTP_CACHE_TTL:
+                with open(path, "rb") as f:
+                    return json.loads(f.read())
+        except (OSError, ValueError):
+            pass
+
+    rate_limiter.acquire()
+    resp = session.get(url, timeout=REQUEST_TIMEOUT)
+    # Decode the raw bytes directly; resp.json() goes through a text decode first
+    body = json.loads(resp.content)
+    if resp.ok:
+        # Write-then-rename so concurrent readers never see a partial file.
+        # The body is stored as received, so there is no re-serialization.
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(resp.content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Failed to cache response for {url}: {e}")
+    return body
+
+
+# Channel -> DAO map, built once (ignore channels explicitly mapped to "None")
+CHANNEL_DAO_MAP = {
+    entry["name"]: entry["dao"]
+    for entry in channels
+    if entry.get("dao") and entry["dao"] != "None"
+}
+
+
+# Top-level watchlist/custom-agent fields read by get_hn_monitors
+MONITOR_FIELDS = ("id", "name", "description", "agentName", "agentType")
+
+
+def slim_monitor(data):
+    """Keep only the fields get_hn_monitors reads, with the channel names already extracted"""
+    slim = {key: data[key] for key in MONITOR_FIELDS if key in data}
+    slim["channels"] = extract_channels(data.get("alertPolicies"))
+    rule = data.get("rule")
+    if isinstance(rule, dict) and "ruleString" in rule:
+        slim["rule"] = {"ruleString": rule["ruleString"]}
+    return slim
+
+
+def fetch_data(url, force_refresh=False):
+    # Slimmed in the worker, so the full response is dropped before the futures hold on to it
+    return slim_monitor(cached_get(url, force_refresh).get("data", {}))
+
+
+def _monitor_ids(suits, key):
+    """Ids of the suits' watchlists/custom agents, deduped in first-seen order.
+    Entries with a missing or unhashable id are left to the per-suit loop, which logs and skips them."""
+    ids = {}
+    for suit in suits:
+        for entry in suit.get(key, []):
+            try:
+                ids[entry["id"]] = None
+            except (KeyError, TypeError):
+                pass
+    return ids
 
 
 # -----------------------
 # Main fetcher
 # -----------------------
-def get_hn_monitors():
+def get_hn_monitors(force_refresh=False):
     start_time = time.time()
     logging.info("Fetching suits from Hypernative API...")
 
-    # Build channel -> DAO map (ignore channels explicitly mapped to "None")
-    channel_dao_map = {
-        entry["name"]: entry["dao"]
-        for entry in channels
-        if entry.get("dao") and entry["dao"] != "None"
-    }
+    # Created here rather than at import, so importing the parsers has no side effects
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
 
-    session = requests.Session()
-    
-    # Add retry strategy for better reliability
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    
-    flattened_rows = []
+    # One list per column, appended in lockstep (cheaper than a dict per row).
+    # Flushed into an Arrow record batch after every suit, so only one suit's rows live as Python lists.
+    cols = {name: [] for name in COLUMN_NAMES}
+    batches = []
+    col_lists = [cols[name] for name in COLUMN_NAMES]
+
+    # A monitor gets one row per channel; only the channel and Client columns vary across those rows
+    channel_col, client_col = cols["monitorAlertChannel"], cols["Client"]
+    monitor_cols = [cols[name] for name in COLUMN_NAMES if name not in ("monitorAlertChannel", "Client")]
+
+    def add_monitor_rows(monitor_values, channels_for_rows):
+        n = len(channels_for_rows)
+        for col, value in zip(monitor_cols, monitor_values):
+            col.extend([value] * n)
+        channel_col.extend(channels_for_rows)
+        client_col.extend(channel_dao(ch, "None") if ch != "None" else "None" for ch in channels_for_rows)
 
     try:
-        suits_resp = session.get(SUITS_ENDPOINT, headers=header, timeout=10).json()
+        suits_resp = cached_get(SUITS_ENDPOINT, force_refresh)
         suits = suits_resp.get("data", {}).get("results", [])
         logging.info(f"Found {len(suits)} suits to process.")
     except Exception as e:
         logging.error(f"Failed to fetch suits: {e}")
         return pd.DataFrame()
 
+    # Fire every watchlist/custom-agent request up front; the loop below
+    # consumes the responses in suit order as they complete.
+    # Ids are deduped across suits first, so a monitor shared by several suits is fetched once.
+    valid_suits = [suit for suit in suits if parse_suit_name(suit.get("name", "")) is not None]
+    watchlist_ids = _monitor_ids(valid_suits, "watchlists")
+    agent_ids = _monitor_ids(valid_suits, "customAgents")
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    watchlist_futures = {
+        wl_id: executor.submit(fetch_data, WATCHLIST_ENDPOINT.format(id=wl_id), force_refresh)
+        for wl_id in watchlist_ids
+    }
+    agent_futures = {
+        agent_id: executor.submit(fetch_data, CUSTOM_AGENT_ENDPOINT.format(id=agent_id), force_refresh)
+        for agent_id in agent_ids
+    }
+    executor.shutdown(wait=False)
+    logging.info(
+        f"Fetching {len(watchlist_futures)} watchlists and {len(agent_futures)} custom agents "
+        f"with {MAX_WORKERS} workers..."
+    )
+
+    channel_dao = CHANNEL_DAO_MAP.get
+
     for i, suit in enumerate(suits, start=1):
         parsed_suit = parse_suit_name(suit.get("name", ""))
         if parsed_suit is None:
             continue
-
-        (
-            suit_contract_type,
-            suit_blockchain,
-            suit_protocol,
-            suit_address,
-            suit_symbol,
-            suit_label,
-        ) = parsed_suit
+        # Suit-level columns, built once per suit
+        suit_fields = (suit.get("name", ""), *parsed_suit)
 
         # ---------- Watchlists ----------
         for watchlist in suit.get("watchlists", []):
             try:
-                wl_endpoint = f"https://api.hypernative.xyz/watchlists/{watchlist['id']}/"
-                wl_data = session.get(wl_endpoint, headers=header, timeout=10).json().get("data", {})
+                wl_data = watchlist_futures[watchlist["id"]].result()
                 wl_id = wl_data.get("id")
                 wl_name = wl_data.get("name", "")
 
@@ -209,7 +364,7 @@ def get_hn_monitors():
                 if parsed_watchlist is None:
                     continue
 
-                alert_channels = extract_channels(wl_data.get("alertPolicies"))
+                alert_channels = wl_data["channels"]
                 # If there are no channels, still create one row with "None"
                 channels_for_rows = alert_channels or ["None"]
                 
@@ -218,50 +373,25 @@ def get_hn_monitors():
                     print(f"DEBUG - Found morpho-action in watchlist '{wl_name}'")
                     print(f"DEBUG - Channels: {channels_for_rows}")
 
-                (
-                    risk_id,
-                    mon_contract_type,
-                    mon_blockchain,
-                    mon_protocol,
-                    mon_address,
-                    mon_symbol,
-                    mon_label,
-                ) = parsed_watchlist
-
-                for ch in channels_for_rows:
-                    client_dao = channel_dao_map.get(ch, "None") if ch != "None" else "None"
-                    flattened_rows.append({
-                        "fullSuiteName": suit.get("name", ""),
-                        "suitContractType": suit_contract_type,
-                        "suitBlockchain": suit_blockchain,
-                        "suitProtocol": suit_protocol,
-                        "suitAddress": suit_address,
-                        "suitSymbol": suit_symbol,
-                        "suitLabel": suit_label,
-                        "fullMonitorName": wl_name,
-                        "monitorType": "Watchlist",
-                        "monitorRiskID": risk_id,
-                        "monitorContractType": mon_contract_type,
-                        "monitorBlockchain": mon_blockchain,
-                        "monitorProtocol": mon_protocol,
-                        "monitorAddress": mon_address,
-                        "monitorSymbol": mon_symbol,
-                        "monitorLabel": mon_label,
-                        "monitorAlertChannel": ch,
-                        "monitorDescription": wl_data.get("description", ""),
-                        "monitorLink": f"https://app.hypernative.xyz/watchlist/{wl_id}" if wl_id else "",
-                        "monitor": "Watchlist",
-                        "Client": client_dao,
-                    })
+                add_monitor_rows(
+                    (
+                        *suit_fields,
+                        wl_name,
+                        "Watchlist",
+                        *parsed_watchlist,
+                        wl_data.get("description", ""),
+                        f"https://app.hypernative.xyz/watchlist/{wl_id}" if wl_id else "",
+                        "Watchlist",
+                    ),
+                    channels_for_rows,
+                )
             except Exception as e:
                 logging.warning(f"Watchlist failed for suit {suit.get('name','(unknown)')}: {e}")
 
         # ---------- Custom Agents ----------
         for custom_agent in suit.get("customAgents", []):
             try:
-                agent_endpoint = f"https://api.hypernative.xyz/custom-agents/{custom_agent['id']}/"
-                agent_resp = session.get(agent_endpoint, headers=header, timeout=10).json()
-                agent_data = agent_resp.get("data", {})
+                agent_data = agent_futures[custom_agent["id"]].result()
                 agent_id = agent_data.get("id")
                 agent_name = agent_data.get("agentName", "")
                 agent_type = agent_data.get("agentType", "Custom Agent")
@@ -270,7 +400,7 @@ def get_hn_monitors():
                 if parsed_agent is None:
                     continue
 
-                alert_channels = extract_channels(agent_data.get("alertPolicies"))
+                alert_channels = agent_data["channels"]
                 channels_for_rows = alert_channels or ["None"]
 
                 # Try to get ruleString safely
@@ -284,51 +414,36 @@ def get_hn_monitors():
                     # Use the agent name as description when ruleString is missing
                     rule_string = agent_name
 
-                (
-                    risk_id,
-                    mon_contract_type,
-                    mon_blockchain,
-                    mon_protocol,
-                    mon_address,
-                    mon_symbol,
-                    mon_label,
-                ) = parsed_agent
-
-                for ch in channels_for_rows:
-                    client_dao = channel_dao_map.get(ch, "None") if ch != "None" else "None"
-                    flattened_rows.append({
-                        "fullSuiteName": suit.get("name", ""),
-                        "suitContractType": suit_contract_type,
-                        "suitBlockchain": suit_blockchain,
-                        "suitProtocol": suit_protocol,
-                        "suitAddress": suit_address,
-                        "suitSymbol": suit_symbol,
-                        "suitLabel": suit_label,
-                        "fullMonitorName": agent_name,
-                        "monitorType": agent_type,
-                        "monitorRiskID": risk_id,
-                        "monitorContractType": mon_contract_type,
-                        "monitorBlockchain": mon_blockchain,
-                        "monitorProtocol": mon_protocol,
-                        "monitorAddress": mon_address,
-                        "monitorSymbol": mon_symbol,
-                        "monitorLabel": mon_label,
-                        "monitorAlertChannel": ch,
-                        "monitorDescription": rule_string,
-                        "monitorLink": f"https://app.hypernative.xyz/custom-agents?agentId={agent_id}" if agent_id else "",
-                        "monitor": "Custom Agent",
-                        "Client": client_dao,
-                    })
+                add_monitor_rows(
+                    (
+                        *suit_fields,
+                        agent_name,
+                        agent_type,
+                        *parsed_agent,
+                        rule_string,
+                        f"https://app.hypernative.xyz/custom-agents?agentId={agent_id}" if agent_id else "",
+                        "Custom Agent",
+                    ),
+                    channels_for_rows,
+                )
 
             except Exception as e:
                 logging.warning(f"Custom agent failed for suit {suit.get('name','(unknown)')}: {e}")
 
+        if col_lists[0]:
+            batches.append(pa.RecordBatch.from_pydict(cols, schema=SCHEMA))
+            for col in col_lists:
+                col.clear()
+
         if i % 10 == 0 or i == len(suits):
             logging.info(f"Processed {i}/{len(suits)} suits...")
-            # Add a small delay to prevent overwhelming the system
-            time.sleep(0.1)
 
-    df = pd.DataFrame(flattened_rows)
+    table = pa.Table.from_batches(batches, schema=SCHEMA)
+    # Dictionary-encoded in Arrow, so to_pandas builds categoricals without a str per row
+    for name in CATEGORY_COLUMNS:
+        i = table.schema.get_field_index(name)
+        table = table.set_column(i, name, pc.dictionary_encode(table.column(i)))
+    df = table.to_pandas()
 
     elapsed = round(time.time() - start_time, 2)
     logging.info(f"Finished in {elapsed}s with {len(df)} rows.")
@@ -1,6 +1,9 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+
+from src.ratelimit import JitterRetry
 load_dotenv()
 
 # api-key
@@ -8,4 +11,15 @@ header = {
     "x-client-id": os.getenv("ID_HYPERNATIVE"),
     "x-client-secret": os.getenv("KEY_HYPERNATIVE"),
     "Content-Type": "application/json",
-}
\ No newline at end of file
+}
+
+# Shared keep-alive session: pooled connections and the api-key headers set once
+session = requests.Session()
+session.headers.update(header)
+adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=JitterRetry(total=5, backoff_factor=0.3, backoff_max=8, status_forcelist=[429, 500, 502, 503, 504]),
+)
+session.mount("http://", adapter)
+session.mount("https://", adapter)
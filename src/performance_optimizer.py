@@ -3,17 +3,22 @@ import time
 import logging
 import requests
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
 import json
 import hashlib
-from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from typing import Dict, List, Optional, Tuple
 import threading
 
 from src.login import header
+from src.ratelimit import JitterRetry, TokenBucket
 from src.channels import channels
+from src.getHN import (
+    COLUMN_NAMES, SCHEMA, parse_suit_name, parse_watchlist_name, parse_custom_agent_name,
+)
 
 # --- Logging setup ---
 logging.basicConfig(
@@ -21,157 +26,234 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+# Repeated string columns, stored and returned as categoricals
+CATEGORY_COLUMNS = (
+    "suitContractType", "suitBlockchain", "monitorType", "monitorContractType",
+    "monitorBlockchain", "monitorAlertChannel", "monitor", "Client",
+)
+
+# App link prefix for watchlist rows; custom agent rows use CUSTOM_AGENT_LINK
+WATCHLIST_LINK = "https://app.hypernative.xyz/watchlist/"
+CUSTOM_AGENT_LINK = "https://app.hypernative.xyz/custom-agents?agentId="
+
+# Task type -> (endpoint template, prefix of the ETag cache file)
+MONITOR_ENDPOINTS = {
+    'watchlist': ("https://api.hypernative.xyz/watchlists/{id}/", "watchlist"),
+    'agent': ("https://api.hypernative.xyz/custom-agents/{id}/", "agent"),
+}
+
 class PerformanceOptimizer:
     def __init__(self):
         self.cache_dir = "cache"
-        self.cache_file = os.path.join(self.cache_dir, "hn_data.json")
-        self.cache_metadata_file = os.path.join(self.cache_dir, "cache_metadata.json")
+        self.cache_file = os.path.join(self.cache_dir, "hn_data.feather")
+        # Suit list and per-monitor responses with their ETag, revalidated on refresh
+        self.monitor_cache_dir = os.path.join(self.cache_dir, "monitors")
         self.cache_duration = 300  # 5 minutes cache
+        # Upper bound on in-flight monitor requests (was 3 suits x 5 monitors)
+        self.max_workers = 32
+        # Request budget for the API: 20 requests per second, bursts of up to 40
+        self._bucket = TokenBucket(rate=20, capacity=40)
         os.makedirs(self.cache_dir, exist_ok=True)
+        os.makedirs(self.monitor_cache_dir, exist_ok=True)
         
         # Thread-safe lock for cache operations
         self.cache_lock = threading.Lock()
         
-    def _get_cache_metadata(self) -> Dict:
-        """Get cache metadata safely"""
-        try:
-            if os.path.exists(self.cache_metadata_file):
-                with open(self.cache_metadata_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            logging.warning(f"Failed to read cache metadata: {e}")
-        return {}
+        # Channel name -> client DAO, mapped over the alert channel column
+        self._channel_dao_map = {
+            entry["name"]: entry["dao"]
+            for entry in channels
+            if entry.get("dao") and entry["dao"] != "None"
+        }
+        
+        # One session for every fetch, so pooled connections survive between refreshes
+        self.session = self.create_session()
+        # Long-lived workers, started on first use and kept warm between refreshes
+        self._monitor_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hn-mon")
+        
+        # Background refresh started when a slightly stale cache is served
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_lock = threading.Lock()
     
-    def _set_cache_metadata(self, metadata: Dict):
-        """Set cache metadata safely"""
+    def close(self):
+        """Stop the worker threads and close pooled connections"""
+        with self._refresh_lock:
+            refresh_thread = self._refresh_thread
+        if refresh_thread is not None:
+            refresh_thread.join()
+        self._monitor_pool.shutdown(wait=True)
+        self.session.close()
+        
+    def cache_age(self) -> Optional[float]:
+        """Seconds since the cache was written (its mtime), None if there is no cache"""
         try:
-            with open(self.cache_metadata_file, 'w') as f:
-                json.dump(metadata, f)
-        except Exception as e:
-            logging.warning(f"Failed to write cache metadata: {e}")
+            return time.time() - os.stat(self.cache_file).st_mtime
+        except FileNotFoundError:
+            return None
     
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
-        try:
-            metadata = self._get_cache_metadata()
-            if not metadata:
-                return False
-                
-            cache_time = datetime.fromisoformat(metadata.get('timestamp', ''))
-            return datetime.now() - cache_time < timedelta(seconds=self.cache_duration)
-        except Exception:
-            return False
+        age = self.cache_age()
+        return age is not None and age < self.cache_duration
     
-    def load_from_cache(self) -> Optional[pd.DataFrame]:
-        """Load data from cache if valid"""
-        with self.cache_lock:
-            if not self.is_cache_valid():
-                return None
-                
-            try:
-                if os.path.exists(self.cache_file):
-                    with open(self.cache_file, 'r') as f:
-                        data = json.load(f)
-                    df = pd.DataFrame(data)
-                    logging.info(f"Loaded {len(df)} rows from cache")
-                    return df
-            except Exception as e:
-                logging.warning(f"Failed to load from cache: {e}")
+    def load_from_cache(self, max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """Load data from cache if it is younger than max_age (default: cache_duration)"""
+        # No lock needed: writers swap the file in with os.replace, so a reader
+        # always maps either the old or the new file, never a partial one
+        age = self.cache_age()
+        if age is None or age >= (max_age or self.cache_duration):
+            return None
+        
+        try:
+            # Arrow IPC maps straight into memory, no decode step
+            df = feather.read_table(self.cache_file, memory_map=True).to_pandas()
+            logging.info(f"Loaded {len(df)} rows from cache")
+            return df
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Failed to load from cache: {e}")
         return None
     
     def save_to_cache(self, df: pd.DataFrame):
         """Save data to cache"""
+        # Write outside the lock; only the rename into place is serialized
+        tmp_path = f"{self.cache_file}.{threading.get_ident()}.tmp"
+        try:
+            feather.write_feather(df.reset_index(drop=True), tmp_path, compression='zstd')
+            with self.cache_lock:
+                os.replace(tmp_path, self.cache_file)
+            logging.info(f"Cached {len(df)} rows")
+        except Exception as e:
+            logging.warning(f"Failed to save to cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def clear_cache(self):
+        """Remove cached data from disk"""
         with self.cache_lock:
             try:
-                # Save data
-                df.to_json(self.cache_file, orient='records', date_format='iso')
-                
-                # Save metadata
-                metadata = {
-                    'timestamp': datetime.now().isoformat(),
-                    'row_count': len(df),
-                    'cache_version': '1.0'
-                }
-                self._set_cache_metadata(metadata)
-                logging.info(f"Cached {len(df)} rows")
+                os.remove(self.cache_file)
+            except FileNotFoundError:
+                pass
             except Exception as e:
-                logging.warning(f"Failed to save to cache: {e}")
+                logging.warning(f"Failed to remove {self.cache_file}: {e}")
     
     def create_session(self) -> requests.Session:
         """Create optimized session with retry strategy"""
         session = requests.Session()
-        retry_strategy = Retry(
+        session.headers.update(header)
+        retry_strategy = JitterRetry(
             total=3,
             backoff_factor=0.5,  # Reduced backoff
+            backoff_max=8,
             status_forcelist=[429, 500, 502, 503, 504],
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers,
+            pool_block=False,
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
     
-    def fetch_suit_data(self, suit: Dict, session: requests.Session) -> List[Dict]:
-        """Fetch all data for a single suit (watchlists + agents) in parallel"""
+    def conditional_get_json(self, session: requests.Session, url: str, cache_name: str, timeout: float = 5) -> Dict:
+        """GET a JSON endpoint, sending If-None-Match for the copy cached on disk"""
+        cache_path = os.path.join(self.monitor_cache_dir, f"{cache_name}.json")
+        cached = None
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Failed to read monitor cache {cache_path}: {e}")
+        
+        request_headers = None
+        if cached and cached.get('etag'):
+            request_headers = {"If-None-Match": cached['etag']}
+        
+        self._bucket.acquire()
+        resp = session.get(url, headers=request_headers, timeout=timeout)
+        if resp.status_code == 304 and cached:
+            return cached['body']
+        
+        # Decode the raw bytes directly; resp.json() goes through a text decode first
+        body = json.loads(resp.content)
+        etag = resp.headers.get("ETag")
+        if resp.status_code == 200 and etag:
+            # Unique temp name: two refreshes can fetch the same URL at once
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump({'etag': etag, 'body': body}, f)
+                os.replace(tmp_path, cache_path)
+            except Exception as e:
+                logging.warning(f"Failed to write monitor cache {cache_path}: {e}")
+        return body
+    
+    @staticmethod
+    def _has_usable_id(entry) -> bool:
+        """Whether a watchlist/agent entry has an id that can key the fetch dedupe"""
+        try:
+            hash(entry["id"])
+            return True
+        except (KeyError, TypeError):
+            return False
+    
+    def get_monitor_tasks(self, suit: Dict) -> List[Tuple]:
+        """List the (task_type, monitor, suit_fields) fetches for a suit"""
         suit_name = suit.get("name", "")
         parsed_suit = self.parse_suit_name(suit_name)
         if parsed_suit is None:
             return []
         
-        (suit_contract_type, suit_blockchain, suit_protocol, 
-         suit_address, suit_symbol, suit_label) = parsed_suit
-        
-        # Prepare tasks for parallel execution
-        tasks = []
-        
-        # Add watchlist tasks
-        for watchlist in suit.get("watchlists", []):
-            tasks.append(('watchlist', watchlist, suit, parsed_suit))
-        
-        # Add custom agent tasks  
-        for custom_agent in suit.get("customAgents", []):
-            tasks.append(('agent', custom_agent, suit, parsed_suit))
-        
-        # Execute tasks in parallel
-        results = []
-        with ThreadPoolExecutor(max_workers=5) as executor:  # Limit concurrent requests
-            future_to_task = {
-                executor.submit(self._fetch_monitor_data, task_type, monitor, suit, parsed_suit, session): task_type
-                for task_type, monitor, suit, parsed_suit in tasks
-            }
-            
-            for future in as_completed(future_to_task):
-                try:
-                    result = future.result()
-                    if result:
-                        results.extend(result)
-                except Exception as e:
-                    task_type = future_to_task[future]
-                    logging.warning(f"Failed to fetch {task_type}: {e}")
-        
-        return results
+        # Suit columns of every row, built once per suit and shared by its monitors
+        contract_type, blockchain, protocol, address, symbol, label = parsed_suit
+        suit_fields = {
+            "fullSuiteName": suit_name,
+            "suitContractType": contract_type,
+            "suitBlockchain": blockchain,
+            "suitProtocol": protocol,
+            "suitAddress": address,
+            "suitSymbol": symbol,
+            "suitLabel": label,
+        }
+        tasks = [('watchlist', watchlist, suit_fields) for watchlist in suit.get("watchlists", []) if self._has_usable_id(watchlist)]
+        tasks += [('agent', custom_agent, suit_fields) for custom_agent in suit.get("customAgents", []) if self._has_usable_id(custom_agent)]
+        return tasks
     
-    def _fetch_monitor_data(self, task_type: str, monitor: Dict, suit: Dict, 
-                           parsed_suit: Tuple, session: requests.Session) -> List[Dict]:
-        """Fetch data for a single monitor (watchlist or agent)"""
+    def fetch_monitor(self, task_type: str, monitor_id: str, session: requests.Session) -> Optional[Dict]:
+        """Fetch the details of one watchlist or agent; None if the request failed"""
+        endpoint, cache_prefix = MONITOR_ENDPOINTS[task_type]
+        try:
+            resp = self.conditional_get_json(session, endpoint.format(id=monitor_id), f"{cache_prefix}_{monitor_id}")
+            return resp.get("data", {})
+        except Exception as e:
+            logging.warning(f"Failed to fetch {task_type} {monitor_id}: {e}")
+        return None
+    
+    def _monitor_row(self, task_type: str, monitor_data: Dict, suit_fields: Dict) -> Optional[Dict]:
+        """Build the row for a single prefetched monitor (watchlist or agent)"""
         try:
             if task_type == 'watchlist':
-                return self._fetch_watchlist_data(monitor, suit, parsed_suit, session)
+                return self._watchlist_row(monitor_data, suit_fields)
             elif task_type == 'agent':
-                return self._fetch_agent_data(monitor, suit, parsed_suit, session)
+                return self._agent_row(monitor_data, suit_fields)
         except Exception as e:
-            logging.warning(f"Failed to fetch {task_type} {monitor.get('id', 'unknown')}: {e}")
-        return []
+            logging.warning(f"Failed to parse {task_type} {monitor_data.get('id', 'unknown')}: {e}")
+        return None
     
-    def _fetch_watchlist_data(self, watchlist: Dict, suit: Dict, 
-                             parsed_suit: Tuple, session: requests.Session) -> List[Dict]:
-        """Fetch watchlist data"""
-        wl_endpoint = f"https://api.hypernative.xyz/watchlists/{watchlist['id']}/"
-        wl_data = session.get(wl_endpoint, headers=header, timeout=5).json().get("data", {})
-        
+    def _watchlist_row(self, wl_data: Dict, suit_fields: Dict) -> Optional[Dict]:
+        """Build the watchlist row from its prefetched data"""
         wl_name = wl_data.get("name", "")
         parsed_watchlist = self.parse_watchlist_name(wl_name)
         if parsed_watchlist is None:
-            return []
+            return None
         
         alert_channels = self.extract_channels(wl_data.get("alertPolicies"))
         channels_for_rows = alert_channels or ["None"]
@@ -179,47 +261,33 @@ class PerformanceOptimizer:
         (risk_id, mon_contract_type, mon_blockchain, mon_protocol, 
          mon_address, mon_symbol, mon_label) = parsed_watchlist
         
-        results = []
-        for ch in channels_for_rows:
-            client_dao = self.get_client_dao(ch)
-            results.append({
-                "fullSuiteName": suit.get("name", ""),
-                "suitContractType": parsed_suit[0],
-                "suitBlockchain": parsed_suit[1],
-                "suitProtocol": parsed_suit[2],
-                "suitAddress": parsed_suit[3],
-                "suitSymbol": parsed_suit[4],
-                "suitLabel": parsed_suit[5],
-                "fullMonitorName": wl_name,
-                "monitorType": "Watchlist",
-                "monitorRiskID": risk_id,
-                "monitorContractType": mon_contract_type,
-                "monitorBlockchain": mon_blockchain,
-                "monitorProtocol": mon_protocol,
-                "monitorAddress": mon_address,
-                "monitorSymbol": mon_symbol,
-                "monitorLabel": mon_label,
-                "monitorAlertChannel": ch,
-                "monitorDescription": wl_data.get("description", ""),
-                "monitorLink": f"https://app.hypernative.xyz/watchlist/{wl_data.get('id')}" if wl_data.get('id') else "",
-                "monitor": "Watchlist",
-                "Client": client_dao,
-            })
-        return results
+        return {
+            **suit_fields,
+            "fullMonitorName": wl_name,
+            "monitorType": "Watchlist",
+            "monitorRiskID": risk_id,
+            "monitorContractType": mon_contract_type,
+            "monitorBlockchain": mon_blockchain,
+            "monitorProtocol": mon_protocol,
+            "monitorAddress": mon_address,
+            "monitorSymbol": mon_symbol,
+            "monitorLabel": mon_label,
+            # Exploded to one row per channel when the DataFrame is built
+            "channels": channels_for_rows,
+            "monitorDescription": wl_data.get("description", ""),
+            # monitorLink is built from the id column by build_dataframe
+            "_monitor_id": str(wl_data.get('id') or ""),
+            "monitor": "Watchlist",
+        }
     
-    def _fetch_agent_data(self, custom_agent: Dict, suit: Dict, 
-                          parsed_suit: Tuple, session: requests.Session) -> List[Dict]:
-        """Fetch custom agent data"""
-        agent_endpoint = f"https://api.hypernative.xyz/custom-agents/{custom_agent['id']}/"
-        agent_resp = session.get(agent_endpoint, headers=header, timeout=5).json()
-        agent_data = agent_resp.get("data", {})
-        
+    def _agent_row(self, agent_data: Dict, suit_fields: Dict) -> Optional[Dict]:
+        """Build the custom agent row from its prefetched data"""
         agent_name = agent_data.get("agentName", "")
         agent_type = agent_data.get("agentType", "Custom Agent")
         
         parsed_agent = self.parse_custom_agent_name(agent_name)
         if parsed_agent is None:
-            return []
+            return None
         
         alert_channels = self.extract_channels(agent_data.get("alertPolicies"))
         channels_for_rows = alert_channels or ["None"]
@@ -233,131 +301,34 @@ class PerformanceOptimizer:
         (risk_id, mon_contract_type, mon_blockchain, mon_protocol, 
          mon_address, mon_symbol, mon_label) = parsed_agent
         
-        results = []
-        for ch in channels_for_rows:
-            client_dao = self.get_client_dao(ch)
-            results.append({
-                "fullSuiteName": suit.get("name", ""),
-                "suitContractType": parsed_suit[0],
-                "suitBlockchain": parsed_suit[1],
-                "suitProtocol": parsed_suit[2],
-                "suitAddress": parsed_suit[3],
-                "suitSymbol": parsed_suit[4],
-                "suitLabel": parsed_suit[5],
-                "fullMonitorName": agent_name,
-                "monitorType": agent_type,
-                "monitorRiskID": risk_id,
-                "monitorContractType": mon_contract_type,
-                "monitorBlockchain": mon_blockchain,
-                "monitorProtocol": mon_protocol,
-                "monitorAddress": mon_address,
-                "monitorSymbol": mon_symbol,
-                "monitorLabel": mon_label,
-                "monitorAlertChannel": ch,
-                "monitorDescription": rule_string,
-                "monitorLink": f"https://app.hypernative.xyz/custom-agents?agentId={agent_data.get('id')}" if agent_data.get('id') else "",
-                "monitor": "Custom Agent",
-                "Client": client_dao,
-            })
-        return results
-    
-    def get_client_dao(self, channel: str) -> str:
-        """Get client DAO for a channel"""
-        channel_dao_map = {
-            entry["name"]: entry["dao"]
-            for entry in channels
-            if entry.get("dao") and entry["dao"] != "None"
+        return {
+            **suit_fields,
+            "fullMonitorName": agent_name,
+            "monitorType": agent_type,
+            "monitorRiskID": risk_id,
+            "monitorContractType": mon_contract_type,
+            "monitorBlockchain": mon_blockchain,
+            "monitorProtocol": mon_protocol,
+            "monitorAddress": mon_address,
+            "monitorSymbol": mon_symbol,
+            "monitorLabel": mon_label,
+            # Exploded to one row per channel when the DataFrame is built
+            "channels": channels_for_rows,
+            "monitorDescription": rule_string,
+            # monitorLink is built from the id column by build_dataframe
+            "_monitor_id": str(agent_data.get('id') or ""),
+            "monitor": "Custom Agent",
         }
-        return channel_dao_map.get(channel, "None") if channel != "None" else "None"
     
-    # Import parsing methods from original getHN.py
+    # Parsing is shared with getHN: dict dispatch on the contract type, bounded splits
     def parse_suit_name(self, name: str):
-        parts = name.split(" ")
-        contract_type = parts[0]
-        symbol = ""
-        if contract_type not in {"[TOKEN]", "[POOL]", "[VAULT]", "[BRIDGE]"}:
-            return None
-        blockchain = parts[1]
-        if contract_type == "[TOKEN]":
-            address = parts[2]
-            symbol = parts[3]
-            label = " ".join(parts[4:])
-            protocol = ""
-        else:
-            protocol = parts[2]
-            address = parts[3]
-            label = " ".join(parts[4:])
-        return contract_type, blockchain, protocol, address, symbol, label
+        return parse_suit_name(name)
 
     def parse_watchlist_name(self, name: str):
-        parts = name.split(" ")
-        risk_id = parts[0]
-        contract_type = parts[1]
-        if contract_type == "[PROTOCOL]":
-            blockchain = parts[2]
-            protocol = parts[3]
-            address = ""
-            label = protocol
-        elif contract_type == "[TOKEN]":
-            blockchain = parts[2]
-            address = parts[3]
-            label = " ".join(parts[4:])
-            protocol = ""
-        elif contract_type == "[CONSENSUSLAYER]":
-            blockchain = parts[2]
-            address = ""
-            protocol = ""
-            label = " ".join(parts[3:])
-        elif contract_type in {"[MULTISIG]", "[POOL]"}:
-            blockchain = parts[2]
-            protocol = parts[3]
-            address = parts[4]
-            label = " ".join(parts[5:])
-        elif contract_type == "[L2]":
-            address = ""
-            blockchain = ""
-            protocol = ""
-            label = " ".join(parts[2:])
-        else:
-            return None
-        return risk_id, contract_type, blockchain, protocol, address, "", label
+        return parse_watchlist_name(name)
 
     def parse_custom_agent_name(self, name: str):
-        parts = name.split(" ")
-        
-        if len(parts) < 2:
-            if len(parts) == 1:
-                return parts[0], "[OTHER]", "", "", "", "", ""
-            else:
-                return None
-        
-        risk_id = parts[0]
-        contract_type = parts[1]
-        contract_type_upper = contract_type.upper()
-        
-        if contract_type_upper in {"[VAULT]", "[EOA]", "[MULTISIG]", "[POOL]", "[OTHER]", "[ORACLE]", "[BRIDGE]", "[TIMELOCK]"}:
-            blockchain = parts[2] if len(parts) > 2 else ""
-            protocol = parts[3] if len(parts) > 3 else ""
-            address = parts[4] if len(parts) > 4 else ""
-            symbol = parts[5] if len(parts) > 5 else ""
-            label = " ".join(parts[6:]) if len(parts) > 6 else ""
-        elif contract_type_upper == "[TOKEN]":
-            blockchain = parts[2] if len(parts) > 2 else ""
-            protocol = ""
-            address = parts[3] if len(parts) > 3 else ""
-            symbol = parts[4] if len(parts) > 4 else ""
-            label = " ".join(parts[5:]) if len(parts) > 5 else ""
-        else:
-            if len(parts) >= 4:
-                blockchain = parts[1] if len(parts) > 1 else ""
-                protocol = parts[2] if len(parts) > 2 else ""
-                address = parts[3] if len(parts) > 3 else ""
-                symbol = parts[4] if len(parts) > 4 else ""
-                label = " ".join(parts[5:]) if len(parts) > 5 else ""
-                contract_type = "[OTHER]"
-            else:
-                return None
-        return risk_id, contract_type, blockchain, protocol, address, symbol, label
+        return parse_custom_agent_name(name)
 
     def extract_channels(self, alert_policies):
         """Extract channel names from alert policies"""
@@ -369,6 +340,56 @@ class PerformanceOptimizer:
                     out.append(name)
         return list(dict.fromkeys(out))
 
+    def build_dataframe(self, monitor_rows: List[Dict]) -> pd.DataFrame:
+        """Expand one row per monitor into one row per (monitor, alert channel)"""
+        if not monitor_rows:
+            return pd.DataFrame()
+        # Column lists fed to Arrow, instead of pandas transposing a list of row dicts
+        columns = {name: [] for name in COLUMN_NAMES if name != "monitorLink"}
+        columns["_monitor_id"] = []
+        for row in monitor_rows:
+            channels_for_rows = row["channels"]
+            repeat = len(channels_for_rows)
+            for name, value in row.items():
+                if name != "channels":
+                    columns[name].extend([value] * repeat)
+            columns["monitorAlertChannel"].extend(channels_for_rows)
+            columns["Client"].extend(
+                self._channel_dao_map.get(ch, "None") if ch != "None" else "None"
+                for ch in channels_for_rows
+            )
+        # Links in one pass over the id column: prefix by monitor kind, empty when there is no id
+        monitor_ids = pa.array(columns.pop("_monitor_id"), pa.string())
+        prefixes = pc.if_else(
+            pc.equal(pa.array(columns["monitor"], pa.string()), "Watchlist"), WATCHLIST_LINK, CUSTOM_AGENT_LINK
+        )
+        columns["monitorLink"] = pc.if_else(
+            pc.equal(monitor_ids, ""), "", pc.binary_join_element_wise(prefixes, monitor_ids, "")
+        )
+        table = pa.Table.from_pydict({name: columns[name] for name in COLUMN_NAMES}, schema=SCHEMA)
+        # Dictionary-encoded columns come out of to_pandas as categoricals
+        for name in CATEGORY_COLUMNS:
+            i = table.schema.get_field_index(name)
+            table = table.set_column(i, name, pc.dictionary_encode(table.column(i)))
+        return table.to_pandas()
+
+    def refresh_in_background(self, limit_suits: int = None) -> bool:
+        """Start a forced refresh on a background thread, unless one is already running"""
+        with self._refresh_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh, args=(limit_suits,), name="hn-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+            return True
+    
+    def _background_refresh(self, limit_suits: int = None):
+        try:
+            self.get_hn_monitors_optimized(force_refresh=True, limit_suits=limit_suits)
+        except Exception as e:
+            logging.warning(f"Background refresh failed: {e}")
+    
     def get_hn_monitors_optimized(self, force_refresh: bool = False, limit_suits: int = None) -> pd.DataFrame:
         """Optimized version of get_hn_monitors with caching and parallel processing"""
         start_time = time.time()
@@ -379,16 +400,24 @@ class PerformanceOptimizer:
             if cached_data is not None:
                 logging.info(f"Using cached data ({len(cached_data)} rows)")
                 return cached_data
+            
+            # Stale-while-revalidate: for one more cache_duration, serve the old copy
+            # right away and refresh it in the background
+            stale_data = self.load_from_cache(max_age=2 * self.cache_duration)
+            if stale_data is not None:
+                self.refresh_in_background(limit_suits)
+                logging.info(f"Using stale cached data ({len(stale_data)} rows) while refreshing")
+                return stale_data
         
         logging.info("Fetching fresh data from Hypernative API...")
         
-        session = self.create_session()
-        flattened_rows = []
+        session = self.session
+        monitor_rows = []
         
         try:
             # Fetch suits
-            suits_resp = session.get("https://api.hypernative.xyz/security-suit/", 
-                                   headers=header, timeout=10).json()
+            # Revalidated too: an unchanged suit list comes back as an empty 304
+            suits_resp = self.conditional_get_json(session, "https://api.hypernative.xyz/security-suit/", "suits", timeout=10)
             suits = suits_resp.get("data", {}).get("results", [])
             logging.info(f"Found {len(suits)} suits to process.")
             
@@ -397,40 +426,37 @@ class PerformanceOptimizer:
                 suits = suits[:limit_suits]
                 logging.info(f"Limited to {len(suits)} suits for testing.")
             
-            # Process suits in parallel batches
-            batch_size = 5  # Process 5 suits at a time
-            for i in range(0, len(suits), batch_size):
-                batch = suits[i:i + batch_size]
-                
-                with ThreadPoolExecutor(max_workers=3) as executor:  # Limit concurrent suits
-                    future_to_suit = {
-                        executor.submit(self.fetch_suit_data, suit, session): suit
-                        for suit in batch
-                    }
-                    
-                    for future in as_completed(future_to_suit):
-                        try:
-                            suit_results = future.result()
-                            flattened_rows.extend(suit_results)
-                        except Exception as e:
-                            suit = future_to_suit[future]
-                            logging.warning(f"Failed to process suit {suit.get('name', 'unknown')}: {e}")
-                
-                # Progress update
-                processed = min(i + batch_size, len(suits))
-                logging.info(f"Processed {processed}/{len(suits)} suits...")
-                
-                # Small delay between batches to be respectful to the API
-                if processed < len(suits):
-                    time.sleep(0.2)
+            # One bounded, long-lived pool over every monitor of every suit, instead of
+            # per-suit pools inside suit batches that waited on their slowest request
+            tasks = [task for suit in suits for task in self.get_monitor_tasks(suit)]
+            # Watchlists and agents shared between suits are fetched once
+            monitor_keys = dict.fromkeys((task_type, monitor["id"]) for task_type, monitor, _ in tasks)
+            monitor_data = {}
+            futures = {
+                key: self._monitor_pool.submit(self.fetch_monitor, key[0], key[1], session)
+                for key in monitor_keys
+            }
+            for done, (key, future) in enumerate(futures.items(), 1):
+                monitor_data[key] = future.result()
+                if done % 100 == 0:
+                    logging.info(f"Fetched {done}/{len(futures)} monitors...")
+            logging.info(f"Fetched {len(futures)} unique monitors for {len(tasks)} suit entries across {len(suits)} suits.")
+            
+            # Rows follow the suit order of the API
+            for task_type, monitor, suit_fields in tasks:
+                data = monitor_data[(task_type, monitor["id"])]
+                if data is not None:
+                    row = self._monitor_row(task_type, data, suit_fields)
+                    if row is not None:
+                        monitor_rows.append(row)
         
         except Exception as e:
             logging.error(f"Failed to fetch suits: {e}")
             return pd.DataFrame()
         
-        df = pd.DataFrame(flattened_rows)
+        df = self.build_dataframe(monitor_rows)
         
-        # Save to cache
+        # Save to cache; categoricals stay dictionary-encoded in the file
         if not df.empty:
             self.save_to_cache(df)
         
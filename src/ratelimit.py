@@ -0,0 +1,45 @@
+import time
+import random
+import threading
+from itertools import takewhile
+
+from urllib3.util.retry import Retry
+
+
+class TokenBucket:
+    """Thread-safe token bucket: up to `capacity` requests at once, refilled at `rate` per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class JitterRetry(Retry):
+    """Retry whose waits are drawn from [backoff_factor, backoff_factor * 3**n] (capped at backoff_max),
+    so workers throttled together don't retry in lockstep; Retry-After still takes precedence"""
+
+    def get_backoff_time(self) -> float:
+        # Only the last run of consecutive errors counts (redirects reset it), as in Retry
+        consecutive_errors = len(
+            list(takewhile(lambda x: x.redirect_location is None, reversed(self.history)))
+        )
+        if consecutive_errors == 0 or self.backoff_factor <= 0:
+            return 0
+        upper = min(self.backoff_max, self.backoff_factor * 3 ** consecutive_errors)
+        return random.uniform(min(self.backoff_factor, upper), upper)